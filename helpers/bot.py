@@ -8,8 +8,11 @@ from .database import BaseDatabase, Contagions, Vaccines
 from logging import getLogger, Logger
 from typing import Dict, List, Tuple, Any, Optional, Union
 from pathlib import Path
-from threading import Thread
+from threading import Thread, Event
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
 import json
+import re
 import time
 import traceback
 import pandas as pd
@@ -29,6 +32,7 @@ from telegram.ext import (
     MessageHandler
 )
 from telegram.error import ChatMigrated, BadRequest
+from telegram.constants import MAX_MESSAGE_LENGTH
 from telegram.ext.filters import Filters
 from functools import partial
 from collections import defaultdict
@@ -45,7 +49,7 @@ class Scheduler:
 
     This class should not be used as it is but as a base class for a derived
     class made for the purpose defining a method that acts as a target for the
-    Scheduler and uses _stop_target to stop itself."""
+    Scheduler and uses _stop_event to stop itself."""
 
     _logger: Logger = None
 
@@ -55,13 +59,13 @@ class Scheduler:
     _args: Tuple = None
     _kwargs: Dict = None
 
-    _stop_target: bool = False
+    _stop_event: Event = None
 
 
     def __init__(self, target, args: Tuple = None, kwargs: Dict = None):
         """Parameters:
         - target: callable to use as Thread target and that stops when
-                  Scheduler._stop_target is True
+                  Scheduler._stop_event is set
         - args: positional arguments to be passed to target
         - kwargs: keyword arguments to be passed to target
         """
@@ -91,7 +95,7 @@ class Scheduler:
             kwargs = self._kwargs
         )
 
-        self._stop_target = False
+        self._stop_event = Event()
         self._thread.start()
 
         self._logger.debug("Scheduler started")
@@ -136,7 +140,7 @@ class Scheduler:
             elif errors == "ignore":
                 return
 
-        self._stop_target = True
+        self._stop_event.set()
 
         self._logger.debug(f"Waiting {timeout} seconds")
         self._thread.join(timeout)
@@ -148,10 +152,14 @@ class Scheduler:
         self._thread = None
 
 
-    def __del__(self):
-        """Safely stop scheduler on deletion."""
+    def __enter__(self):
+        """Use scheduler as a context manager that stops it on exit."""
+
+        return self
 
-        self._logger.debug("Deleting scheduler")
+
+    def __exit__(self, *args) -> None:
+        """Safely stop scheduler on context exit."""
 
         self.stop()
 
@@ -166,6 +174,27 @@ class Reporter(Scheduler):
     _tz: str = "Europe/Rome"
     _do_not_disturb: Tuple = ("21:00", "10:00")
 
+    # do not disturb times as minutes from midnight
+    _do_not_disturb_minutes: Tuple[int, int] = None
+
+    # threads used to send reports of different chats
+    _send_workers: int = 4
+
+    # databases updates counter; caches keys start with the epoch data were
+    # read in, so data read before an update by a report request are never
+    # reused after it
+    _cache_epoch: int = 0
+
+    # generated reports; keys are (epoch, db_key, area, current, fmt) tuples
+    # old epochs are dropped every time databases are updated
+    _report_cache: Dict[Tuple[int, str, str, str, str], pd.DataFrame] = None
+
+    # reports data; keys are (epoch, db_key, area) tuples
+    _df_cache: Dict[Tuple[int, str, str], pd.DataFrame] = None
+
+    # formatted reports; keys are (epoch, report name, current) tuples
+    _format_cache: Dict[Tuple[int, str, str], str] = None
+
     # report delivery periods
     _periods: list[str] = ["giorno", "settimana", "mese"]
 
@@ -184,6 +213,12 @@ class Reporter(Scheduler):
         "mese": pd.Timedelta(days = -32)
     }
 
+    # (period, fmt, offset) triples of report delivery periods
+    _periods_settings: List[Tuple[str, str, pd.Timedelta]] = list(zip(
+        _periods, map(_period_fmt.get, _periods),
+        map(_period_offset.get, _periods)
+    ))
+
     # variables to use in reports: (db_name, (var_name, var_type))
     # variable types according to Reporter.get_report
     _db_variables: Dict[str, Dict[str,str]] = {
@@ -209,6 +244,48 @@ class Reporter(Scheduler):
         }
     }
 
+    # columns read from databases to generate reports
+    _db_columns: Dict[str, List[str]] = {
+        key: list(variables.keys()) for key, variables in _db_variables.items()
+    }
+
+    # columns types used when reading databases;
+    # contagions data contain missing values
+    _db_dtypes: Dict[str, Dict[str,str]] = {
+        "contagions": {
+            "nuovi_positivi": "float64",
+            "totale_positivi": "float64",
+            "ricoverati_con_sintomi": "float64",
+            "terapia_intensiva": "float64",
+            "isolamento_domiciliare": "float64",
+            "dimessi_guariti": "float64",
+            "deceduti": "float64",
+            "tamponi": "float64",
+            "tamponi_test_molecolare": "float64",
+            "tamponi_test_antigenico_rapido": "float64"
+        },
+        "vaccines": {
+            "prima_dose": "int32",
+            "seconda_dose": "int32",
+            "pregressa_infezione": "int32",
+            "dose_addizionale_booster": "int32"
+        }
+    }
+
+    # date columns parsed when reading databases
+    _db_dates: Dict[str, List[str]] = {
+        key: [
+            column for column, kind in variables.items() if kind == "date"
+        ]
+        for key, variables in _db_variables.items()
+    }
+
+    # databases classes used when no database is passed
+    _db_classes: Dict[str, type] = {
+        "contagions": Contagions,
+        "vaccines": Vaccines
+    }
+
     # db names italian translations
     _db_translations: Dict[str,str] = {
         "contagions": "contagi",
@@ -272,13 +349,10 @@ class Reporter(Scheduler):
             errors = "ignore"
 
         # check if there are some missing variables
-        isin_var = np.isin(
-            element=list(variables.keys()), test_elements=df.columns.tolist()
-        )
+        missing = [var for var in variables if var not in df.columns]
 
-        if not isin_var.all():
-            s = "missing variables found; ignoring them: "
-            s += str(np.array(list(variables.keys()))[isin_var].tolist())
+        if len(missing) > 0:
+            s = f"missing variables found; ignoring them: {missing}"
 
             if errors == "strict":
                 raise ValueError(s)
@@ -286,16 +360,12 @@ class Reporter(Scheduler):
                 self._logger.warning(s.capitalize())
 
         # check if there is one or more date variables
-        is_date = np.apply_along_axis(
-            lambda s: s == "date", arr=list(variables.values()), axis=0
-        )
+        date_columns = [var for var, T in variables.items() if T == "date"]
 
-        if not is_date.any():
+        if len(date_columns) == 0:
             raise ValueError("there is not a date variable in passed ones")
 
-        date_columns = np.array(list(variables.keys()))[is_date].tolist()
-
-        if is_date.sum() > 1:
+        if len(date_columns) > 1:
             s = f"there are more than one date variable: {date_columns}"
 
             if errors == "strict":
@@ -314,170 +384,396 @@ class Reporter(Scheduler):
         # filter columns
         df = df.filter(variables.keys())
 
-        # transform dates
-        df.insert(
-            loc=0, column=date_column_fmt,
-            value=df.loc[:, date_column].apply(
-                lambda t: pd.Timestamp(t).strftime(fmt)
-            )
-        )
+        # format unique dates only; date_map values are formatted periods
+        # indexed by dates
+        unique_dates = df.loc[:, date_column].unique()
+        dates = pd.Series(unique_dates)
+
+        # dates may be already parsed
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+
+        date_map = pd.Series(dates.dt.strftime(fmt).values, index=unique_dates)
+        date_map = date_map.dropna()
 
         # check current date is present in dataframe
-        if current not in df.loc[:, date_column_fmt].tolist():
+        dates_fmt = np.sort(date_map.unique())
+        i = np.searchsorted(dates_fmt, current)
+
+        if i == len(dates_fmt) or dates_fmt[i] != current:
             raise ValueError(
                 f"dataframe does not contain current \"{current}\""
             )
 
         # get previous date
-        dates_fmt = df.loc[:, date_column_fmt].drop_duplicates().sort_values()
-        previous = dates_fmt.iloc[dates_fmt.tolist().index(current)-1]
+        if i == 0:
+            raise ValueError(
+                f"dataframe does not contain a period before \"{current}\""
+            )
 
-        self._logger.debug(f"Previous: \"{previous}\"")
+        previous = dates_fmt[i-1]
 
-        # keep only current and previous dates to speed up calculations
-        df = df.loc[df.loc[:, date_column_fmt].isin([previous, current])]
+        self._logger.debug(f"Previous: \"{previous}\"")
 
-        # generate report
-        report = pd.DataFrame(
-            columns=["totale", "media", "dev std", "var pct"],
-            dtype=object
+        # keep only current and previous dates to speed up calculations;
+        # last date before previous period is kept apart to seed cumulative
+        # variables differences
+        seed = date_map.index[(date_map < previous).values].max()
+        date_map = date_map.loc[date_map.isin([previous, current])]
+
+        is_period = df.loc[:, date_column].isin(date_map.index)
+        df_seed = df.loc[is_period | (df.loc[:, date_column] == seed)]
+        df = df.loc[is_period]
+        df = df.assign(
+            **{date_column_fmt: df.loc[:, date_column].map(date_map)}
         )
 
-        for var, T in variables.items():
-            sel = df.filter([date_column, date_column_fmt, var])
+        # variables by type
+        actual = [
+            var for var, T in variables.items()
+            if T == "actual" and var in df.columns
+        ]
+        cumulative = [
+            var for var, T in variables.items()
+            if T == "cumulative" and var in df.columns
+        ]
 
-            if T == "actual":
-                pass
-            elif T == "cumulative": # convert in actual values
-                sel = sel.drop(columns=date_column_fmt)
-                sel = sel.groupby(date_column).max().diff()
-                sel = sel.reset_index()
-                sel.insert(
-                    loc=0, column=date_column_fmt,
-                    value=sel.loc[:, date_column].apply(
-                        lambda t: pd.Timestamp(t).strftime(fmt)
-                    )
-                )
-            else:
-                continue
+        # (values, periods) pairs of variables;
+        # cumulative variables are converted in actual values
+        data = []
+
+        if len(actual) > 0:
+            data += [(df.loc[:, actual], df.loc[:, date_column_fmt])]
 
-            sel = sel.drop(columns=date_column).groupby(date_column_fmt)
-            values = list(map(
-                lambda x: x.loc[current].values[0],
-                [sel.sum(), sel.mean(), sel.std(), sel.mean().pct_change()*100]
-            ))
+        if len(cumulative) > 0:
+            sel = df_seed.groupby(date_column)[cumulative].max().diff()
+            sel = sel.loc[sel.index.isin(date_map.index)]
+            data += [(sel, sel.index.map(date_map))]
 
-            report = report.append(pd.DataFrame(
-                [values], columns=report.columns, index=[var.replace("_", " ")]
-            ))
+        # aggregate values of every variable at once
+        columns = []
+        current_stats = []
+        previous_mean = []
+
+        for values, periods in data:
+            columns += values.columns.tolist()
+            values = values.to_numpy(dtype=float)
+            periods = np.asarray(periods)
+
+            current_stats += [self._period_stats(values[periods == current])]
+            previous_mean += [
+                self._period_stats(values[periods == previous])[1]
+            ]
+
+        total, mean, std = np.hstack(current_stats)
+        previous_mean = np.hstack(previous_mean)
+
+        # generate report
+        with np.errstate(divide="ignore", invalid="ignore"):
+            report = pd.DataFrame(
+                {
+                    "totale": total, "media": mean, "dev std": std,
+                    "var pct": (mean / previous_mean - 1) * 100
+                },
+                index=columns
+            )
+
+        # keep variables order
+        report = report.loc[[var for var in variables if var in report.index]]
+        report.index = [var.replace("_", " ") for var in report.index]
 
         self._logger.debug(f"Returning report: \n{report}")
 
         return report
 
 
-    def send_reports(
-        self, chat_id: int, db_key: str, current: str, fmt: str = "%Y-%m-%d",
-        settings: Optional[Dict[str,Any]] = None
-    ) -> None:
-        """Send reports to chat.
+    def _period_stats(self, values: np.ndarray) -> np.ndarray:
+        """Sum, mean and standard deviation of values columns; NaN values are
+        ignored as pandas does.
 
         Parameters:
-        - chat_id
-        - db_key: select database for reports
-        - current, fmt: documented in Reporter.get_report
-        - settings: report generation settings; if None they are read from
-                    chat_data
+        - values: 2-dimensional array of one period values, one column per
+                  variable
+
+        Returns:
+        array of shape (3, number of columns)
         """
 
-        self._bot.get_chat_logger(chat_id).debug(
-            f"Sending reports: db_key = \"{db_key}\", current = \"{current}\", "
-            f"fmt = \"{fmt}\", settings = {json.dumps(settings, indent=4)}"
+        n = (~np.isnan(values)).sum(axis=0)
+        total = np.nansum(values, axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / n
+            var = np.nansum((values - mean) ** 2, axis=0) / (n - 1)
+
+        std = np.where(n > 1, np.sqrt(var), np.nan)
+
+        return np.vstack([total, mean, std])
+
+
+    def format_report(
+        self, report: pd.DataFrame, current: str, epoch: Optional[int] = None
+    ) -> str:
+        """Format report as text.
+
+        Parameters:
+        - report: report named after database and area
+        - current: documented in Reporter.get_report
+        - epoch: cache epoch report data were read in; if None, current epoch
+                 is used
+
+        Returns:
+        text
+        """
+
+        if epoch == None:
+            epoch = self._cache_epoch
+
+        key = (epoch, report.name, current)
+
+        if key in self._format_cache:
+            return self._format_cache[key]
+
+        # format all values at once: integers without decimals, other values
+        # with one decimal, missing or infinite values as \"-\"
+        values = report.to_numpy(dtype=float)
+        is_finite = np.isfinite(values)
+        is_int = is_finite & (values == np.round(values))
+
+        cells = np.where(
+            is_int,
+            np.char.mod("%d", np.where(is_int, values, 0).astype(np.int64)),
+            np.char.mod("%.1f", values)
         )
+        cells = np.where(is_finite, cells, "-")
 
-        if settings == None:
-            settings = self._bot.get_chat_data(chat_id)
+        # text lines, joined once at the end
+        lines = [f"{report.name} ({current})", "-" * 40]
 
-        # generate reports
-        reports = []
+        for i, row in enumerate(report.index.tolist()):
+            for j, col in enumerate(report.columns.tolist()):
+                lines += [col.capitalize() + " " + row, cells[i, j]]
+
+        text = "\n".join(lines) + "\n"
+
+        self._format_cache[key] = text
+
+        return text
+
+
+    def _drop_old_caches(self) -> None:
+        """Drop cached entries of previous epochs.
+        Report requests may store entries of an old epoch meanwhile; those
+        are never read and are dropped at next update.
+        """
 
-        if settings.get(db_key) != None and "Italia" in settings.get(db_key):
+        for cache in [self._report_cache, self._df_cache, self._format_cache]:
+            # keys are copied first, other threads may be adding entries
+            for key in list(cache.keys()):
+                if key[0] != self._cache_epoch:
+                    cache.pop(key, None)
+
+
+    def _get_areas(self, settings: Dict[str,Any], db_key: str) -> List[str]:
+        """Areas selected in settings for db_key reports; \"Italia\" is always
+        the first one when selected.
+        """
+
+        areas = settings.get(db_key)
+
+        if areas == None:
+            return []
+
+        if type(areas) == str:
+            areas = [areas]
+
+        regions = [area for area in areas if area != "Italia"]
+
+        if "Italia" in areas:
+            return ["Italia"] + regions
+
+        return regions
+
+
+    def _get_area_df(
+        self, db_key: str, area: str, epoch: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Get report data of an area; data are read once and reused until
+        databases are updated.
+
+        Parameters:
+        - db_key: select database
+        - area: \"Italia\" or a region
+        - epoch: cache epoch; if None, current epoch is used
+
+        Returns:
+        dataframe with report columns only
+        """
+
+        if epoch == None:
+            epoch = self._cache_epoch
+
+        key = (epoch, db_key, area)
+        df = self._df_cache.get(key)
+
+        if df is not None:
+            self._logger.debug(f"Returning cached dataframe: key = {key}")
+            return df
+
+        kwargs = {
+            "usecols": self._db_columns[db_key],
+            "dtype": self._db_dtypes[db_key],
+            "parse_dates": self._db_dates[db_key]
+        }
+
+        if area == "Italia":
             df = self._db[db_key].get_df(
-                self._db_files_keys[db_key]["national"]
+                self._db_files_keys[db_key]["national"], **kwargs
+            )
+        else:
+            df = self._db[db_key].get_df(
+                self._db_files_keys[db_key]["regional"], area = area, **kwargs
             )
 
-            # aggregate data of the same date and area
-            if db_key == "vaccines":
-                df = df.groupby("data_somministrazione").sum().reset_index()
+        # aggregate data of the same date and area
+        if db_key == "vaccines":
+            df = df.groupby("data_somministrazione").sum().reset_index()
 
-            report = self.get_report(
-                df, variables = self._db_variables[db_key], current = current,
-                fmt = fmt
-            )
+        self._df_cache[key] = df
+
+        return df
 
-            report.name = \
-            f"{self._db_translations[db_key].capitalize()} Italia"
 
-            reports += [report]
+    def _get_area_report(
+        self, db_key: str, area: str, current: str, fmt: str = "%Y-%m-%d",
+        epoch: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Get report of an area; reports are generated once and reused until
+        databases are updated.
+
+        Parameters:
+        - db_key: select database for report
+        - area: \"Italia\" or a region
+        - current, fmt: documented in Reporter.get_report
+        - epoch: cache epoch; if None, current epoch is used
 
-        regions = settings.get(db_key)
+        Returns:
+        report named after database and area
+        """
 
-        if type(regions) == str:
-            regions = [regions]
+        if epoch == None:
+            epoch = self._cache_epoch
 
-        if regions != None:
-            for region in regions:
+        key = (epoch, db_key, area, current, fmt)
+        report = self._report_cache.get(key)
 
-                if region == "Italia":
-                    continue
+        if report is not None:
+            self._logger.debug(f"Returning cached report: key = {key}")
+            return report
 
-                df = self._db[db_key].get_df(
-                    self._db_files_keys[db_key]["regional"],
-                    area = region
-                )
+        report = self.get_report(
+            self._get_area_df(db_key, area, epoch),
+            variables = self._db_variables[db_key], current = current,
+            fmt = fmt
+        )
+
+        report.name = f"{self._db_translations[db_key].capitalize()} {area}"
+
+        self._report_cache[key] = report
+
+        return report
+
+
+    def send_reports(
+        self, chat_id: int, db_keys: Union[str, List[str]], current: str,
+        fmt: str = "%Y-%m-%d", settings: Optional[Dict[str,Any]] = None
+    ) -> List[str]:
+        """Send reports to chat.
+        Reports of all databases are delivered together: textual reports are
+        packed in the same messages and Excel reports are written in a single
+        workbook. Databases whose reports cannot be generated are skipped.
+
+        Parameters:
+        - chat_id
+        - db_keys: select databases for reports
+        - current, fmt: documented in Reporter.get_report
+        - settings: report generation settings; if None they are read from
+                    chat_data
+
+        Returns:
+        databases keys of delivered reports
+
+        Raises:
+        ValueError if no database report can be generated
+        """
+
+        if type(db_keys) == str:
+            db_keys = [db_keys]
+
+        logger = self._bot.get_chat_logger(chat_id)
 
-                # aggregate data of the same date and area
-                if db_key == "vaccines":
-                    df = df.groupby("data_somministrazione").sum().reset_index()
+        logger.debug(
+            f"Sending reports: db_keys = {db_keys}, current = \"{current}\", "
+            f"fmt = \"{fmt}\", settings = {json.dumps(settings, indent=4)}"
+        )
+
+        if settings == None:
+            settings = self._bot.get_chat_data(chat_id)
+
+        # databases may be updated meanwhile: reports use the cache epoch of
+        # the moment they are requested
+        epoch = self._cache_epoch
+
+        # generate reports of every database separately
+        reports = []
+        delivered = []
+        translations = []
 
-                report = self.get_report(
-                    df, variables = self._db_variables[db_key],
-                    current = current, fmt = fmt
+        for db_key in db_keys:
+            try:
+                db_reports = [
+                    self._get_area_report(db_key, area, current, fmt, epoch)
+                    for area in self._get_areas(settings, db_key)
+                ]
+            except:
+                logger.debug(
+                    f"Unable to generate \"{db_key}\" reports: "
+                    f"{traceback.format_exc()}"
                 )
+                continue
+
+            reports += db_reports
+            delivered += [db_key]
+
+            if len(db_reports) > 0:
+                translations += [self._db_translations[db_key]]
 
-                report.name = \
-                f"{self._db_translations[db_key].capitalize()} {region}"
+        if len(delivered) == 0:
+            raise ValueError("no database report can be generated")
 
-                reports += [report]
+        # no area selected
+        if len(reports) == 0:
+            logger.debug("No reports to send")
+            return delivered
 
         # format and send reports
 
         # textual format
         if settings.get("format") == "testuale":
 
-            self._bot.get_chat_logger(chat_id).debug("Sending textual report")
+            logger.debug("Sending textual report")
 
+            # pack reports in as few messages as possible
             texts = []
 
             for report in reports:
-                text = f"{report.name} ({current})\n"
-                text += "-" * 40 + "\n"
+                text = self.format_report(report, current, epoch)
 
-                for row in report.index.tolist():
-                    for col in report.columns.tolist():
-                        text += col.capitalize() + " " + row
-                        text += "\n"
-
-                        x = report.loc[row,col]
-
-                        if int(x) == x:
-                            text += "{:d}".format(int(x))
-                        else:
-                            text += "{:.1f}".format(x)
-
-                        text += "\n"
-
-                texts += [text]
+                if len(texts) > 0 \
+                and len(texts[-1]) + 1 + len(text) <= MAX_MESSAGE_LENGTH:
+                    texts[-1] += "\n" + text
+                else:
+                    texts += [text]
 
             # send messages
             for text in texts:
@@ -492,26 +788,105 @@ class Reporter(Scheduler):
         # this handles also missing format setting
         # (should not be but if there in case of a bug this is more secure)
         else:
-            self._bot.get_chat_logger(chat_id).debug("Sending Excel report")
+            logger.debug("Sending Excel report")
 
-            path = f"/tmp/{db_key}.xlsx"
+            # workbook is written in memory
+            buffer = BytesIO()
 
-            with pd.ExcelWriter(path=path) as writer:
+            with pd.ExcelWriter(buffer) as writer:
                 for report in reports:
-                    report.to_excel(writer, sheet_name=report.name)
+                    # sheet names are limited to 31 characters and some
+                    # characters are not allowed (e.g. \"Bolzano / Bozen\")
+                    sheet_name = re.sub(r"[\[\]:*?/\\]", "-", report.name)
+                    report.to_excel(writer, sheet_name=sheet_name[:31])
 
             # send
-            with open(path, "rb") as file:
-                self._bot.send_document(
-                    chat_id = chat_id, document = file.read(),
-                    filename = f"{self._db_translations[db_key]}.xlsx",
-                    caption = current.capitalize()
-                )
+            self._bot.send_document(
+                chat_id = chat_id, document = buffer.getvalue(),
+                filename = f"{'_'.join(translations)}.xlsx",
+                caption = current.capitalize()
+            )
 
-        self._bot.get_chat_logger(chat_id).info(
-            f"Reports \"{self._db_translations[db_key]} {current}\" delivered"
+        logger.info(
+            f"Reports \"{', '.join(translations)} {current}\" delivered"
         )
 
+        return delivered
+
+
+    def _is_sent(
+        self, settings: Dict[str,Any], db_key: str, current: str
+    ) -> bool:
+        """Returns True if current db_key report was already sent to chat with
+        settings.
+        """
+
+        return type(settings.get("last_report")) == dict \
+        and current == settings["last_report"].get(db_key)
+
+
+    def _send_chat_reports(
+        self, chat_id: int, settings: Dict[str,Any], db_keys: List[str],
+        current: str, fmt: str, unavailable: Optional[set] = None
+    ) -> List[str]:
+        """Send chat reports of some databases.
+
+        Parameters:
+        - chat_id
+        - settings: chat report settings
+        - db_keys: databases of reports to send
+        - current, fmt: documented in Reporter.get_report
+        - unavailable: (db_key, area, current, fmt) keys of reports that
+                       cannot be generated; databases with such a report are
+                       skipped
+
+        Returns:
+        databases keys of delivered reports
+        """
+
+        if unavailable == None:
+            unavailable = set()
+
+        logger = self._bot.get_chat_logger(chat_id)
+        logger.debug(f"Settings: {settings}")
+
+        available = []
+
+        for db_key in db_keys:
+
+            # some report is not available yet
+            if any(
+                (db_key, area, current, fmt) in unavailable
+                for area in self._get_areas(settings, db_key)
+            ):
+                logger.debug(
+                    f"Skipping \"{db_key}\" report delivery with period "
+                    f"\"{settings.get('period')}\": report not available"
+                )
+                continue
+
+            available += [db_key]
+
+        if len(available) == 0:
+            return []
+
+        try:
+            # send new reports together
+            available = self.send_reports(
+                chat_id, available, current=current, fmt=fmt,
+                settings=settings
+            )
+
+        except:
+            # unable to send reports
+            logger.debug(
+                "Report delivery encountered an error: "
+                f"{traceback.format_exc()}"
+            )
+            return []
+
+        return available
+
 
     def _target(self, sleep: int = 30*60, master_sleep: int = 10) -> None:
         """Keep trying to send new reports.
@@ -527,85 +902,122 @@ class Reporter(Scheduler):
             f"Target: sleep = {sleep}, master_sleep = {master_sleep}"
         )
 
-        # previous reports sending attempt
-        previous: pd.Timestamp = None
+        # previous reports sending attempt; monotonic clock seconds
+        previous: float = None
 
-        while not self._stop_target:
+        while not self._stop_event.is_set():
 
-            # this is not the first iteration => master sleep
-            if previous != None:
-                time.sleep(master_sleep)
-
-            now = pd.Timestamp.utcnow().tz_convert(self._tz)
-
-            if previous != None and (now - previous).seconds <= sleep:
-                continue # sleep
+            if previous != None and time.monotonic() - previous <= sleep:
+                # master sleep; returns early when scheduler is stopped
+                self._stop_event.wait(master_sleep)
+                continue
 
             self._logger.debug("Running target")
 
-            previous = now
+            previous = time.monotonic()
+            now = pd.Timestamp.utcnow().tz_convert(self._tz)
 
             # do not disturb
-            T0, T = tuple(map(
-                lambda t: pd.Timestamp(t, tz=self._tz), self._do_not_disturb
-            ))
+            T0, T = self._do_not_disturb_minutes
+            t = now.hour * 60 + now.minute
 
-            if T0 < T and T0 < now and now < T \
-            or T0 > T and (T0 < now or now < T):
+            if T0 < T and T0 <= t and t < T \
+            or T0 > T and (T0 <= t or t < T):
                 self._logger.debug("Target respects \"do not disturb\"")
                 continue
 
-            # update databases
-            for db in self._db.values():
-                db.update()
+            chat_data = self._bot.get_chat_data()
 
-            for chat_id, settings in self._bot.get_chat_data().items():
-                for period in self._periods:
+            # current period and fmt of every period
+            currents = {
+                period: ((now + offset).strftime(fmt), fmt)
+                for period, fmt, offset in self._periods_settings
+            }
 
-                    fmt = self._period_fmt[period]
+            # (current, fmt, databases) of reports subscribed chats are
+            # waiting for; chat settings may change meanwhile, so periods
+            # are read only here
+            pending: Dict[int, Tuple[str, str, List[str]]] = {}
 
-                    self._bot.get_chat_logger(chat_id).debug(
-                        f"Settings: {settings}"
-                    )
+            for chat_id, settings in chat_data.items():
+                if settings.get("period") not in currents:
+                    continue
 
-                    current = now + self._period_offset[period]
-                    current = current.strftime(fmt)
+                current, fmt = currents[settings["period"]]
+                db_keys = [
+                    db_key for db_key in self._db.keys()
+                    if not self._is_sent(settings, db_key, current)
+                ]
 
-                    # skip user
-                    if settings.get("period") != period:
-                        self._bot.get_chat_logger(chat_id).debug(
-                            "Skipping report delivery with period "
-                            f"\"{period}\": not subscribed"
-                        )
-                        continue
+                if len(db_keys) > 0:
+                    pending[chat_id] = (current, fmt, db_keys)
 
-                    for db_key in self._db.keys():
+            # no chat is waiting for a report => skip databases updates
+            if len(pending) == 0:
+                self._logger.debug("No reports to send")
+                continue
 
-                        # current report already sent
-                        if type(settings.get("last_report")) == dict \
-                        and current == settings["last_report"].get(db_key):
-                            self._bot.get_chat_logger(chat_id).debug(
-                                "Skipping report delivery with period "
-                                f"\"{period}\": already sent"
-                            )
+            # update needed databases concurrently; updates are mostly
+            # downloads
+            db_keys = {
+                db_key for _, _, keys in pending.values() for db_key in keys
+            }
+
+            with ThreadPoolExecutor(max_workers=len(db_keys)) as executor:
+                list(executor.map(lambda key: self._db[key].update(), db_keys))
+
+            # reports of old data are not valid anymore
+            self._cache_epoch += 1
+            self._drop_old_caches()
+
+            # generate reports needed by chats once before sending them;
+            # reports that cannot be generated yet are skipped for every chat
+            unavailable = set()
+
+            for chat_id, (current, fmt, db_keys) in pending.items():
+                for db_key in db_keys:
+                    for area in self._get_areas(chat_data[chat_id], db_key):
+                        key = (db_key, area, current, fmt)
+
+                        if key in unavailable:
                             continue
 
                         try:
-                            # send new report
-                            self.send_reports(
-                                chat_id, db_key, current=current, fmt=fmt
+                            self._get_area_report(*key)
+                        except:
+                            self._logger.debug(
+                                f"Report not available: key = {key}: "
+                                f"{traceback.format_exc()}"
                             )
-
+                            unavailable.add(key)
+
+            # send reports of different chats concurrently, sending is
+            # mostly network I/O; last reports are updated by this thread
+            with ThreadPoolExecutor(max_workers=self._send_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._send_chat_reports, chat_id, chat_data[chat_id],
+                        db_keys, current, fmt, unavailable=unavailable
+                    ): chat_id
+                    for chat_id, (current, fmt, db_keys) in pending.items()
+                }
+
+                for future in as_completed(futures):
+                    chat_id = futures[future]
+                    current = pending[chat_id][0]
+
+                    try:
+                        for db_key in future.result():
                             self._bot.update_last_report(
                                 chat_id, db_key, current
                             )
 
-                        except:
-                            # unable to send report
-                            self._bot.get_chat_logger(chat_id).debug(
-                                "Report delivery encountered an error: "
-                                f"{traceback.format_exc()}"
-                            )
+                    except:
+                        # one chat failure must not stop the scheduler
+                        self._bot.get_chat_logger(chat_id).debug(
+                            "Report delivery encountered an error: "
+                            f"{traceback.format_exc()}"
+                        )
 
 
     def __init__(
@@ -622,16 +1034,25 @@ class Reporter(Scheduler):
         self._logger = getLogger(str(self))
 
         self._bot = bot
+        self._report_cache = {}
+        self._format_cache = {}
+        self._df_cache = {}
 
-        for var in ["db", "tz", "do_not_disturb"]:
-            if eval(var) != None:
-                exec(f"self._{var} = {var}")
+        if tz != None:
+            self._tz = tz
 
-        if db == None:
-            self._db = {
-                key: eval(f"{key.capitalize}()")
-                for key in ["contagions", "vaccines"]
-            }
+        if do_not_disturb != None:
+            self._do_not_disturb = do_not_disturb
+
+        self._do_not_disturb_minutes = tuple(
+            int(t.split(":")[0]) * 60 + int(t.split(":")[1])
+            for t in self._do_not_disturb
+        )
+
+        if db != None:
+            self._db = db
+        else:
+            self._db = {key: cls() for key, cls in self._db_classes.items()}
 
         self._logger.debug(
             f"Reporter created: bot = {self._bot}, db = {self._db}, "
@@ -1046,8 +1467,9 @@ class MyBot:
             current = current.strftime(fmt)
 
             # send report
-            for key in self._db.keys():
-                self._scheduler.send_reports(chat_id, key, current, fmt)
+            self._scheduler.send_reports(
+                chat_id, list(self._db.keys()), current, fmt
+            )
 
         # unable to send requested report
         except:
@@ -1276,11 +1698,11 @@ class MyBot:
 
         self._logger.debug("Updating available regions")
 
-        for key, area_column, df_key in zip(
-            ["contagions", "vaccines"], ["denominazione_regione", "nome_area"],
-            ["regional", "doses"]
+        for key, df_key in zip(
+            ["contagions", "vaccines"], ["regional", "doses"]
         ):
-            regions = self._db[key].get_df(df_key)
+            area_column = self._db[key].get_area_column()
+            regions = self._db[key].get_df(df_key, usecols=[area_column])
             regions = regions.loc[:, area_column].drop_duplicates()
             regions = regions.sort_values().tolist()
 
@@ -1413,15 +1835,17 @@ class MyBot:
 
         self._logger = getLogger(str(self))
 
-        for var in ["msg_dir", "pkl_path", "db"]:
-            if eval(var) != None:
-                exec(f"self._{var} = {var}")
+        for name, value in [
+            ("msg_dir", msg_dir), ("announcements_dir", announcements_dir),
+            ("pkl_path", pkl_path), ("db", db)
+        ]:
+            if value != None:
+                setattr(self, f"_{name}", value)
 
         # databases
         if db == None:
             self._db = {
-                key: eval(f"{key.capitalize()}()")
-                for key in ["contagions", "vaccines"]
+                key: cls() for key, cls in Reporter._db_classes.items()
             }
 
         self._logger.debug(
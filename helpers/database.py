@@ -5,11 +5,11 @@
 from logging import getLogger, Logger
 from typing import Dict, List, Union, Optional
 from pathlib import Path
-import os
 from urllib.request import urlopen
 import numpy as np
 import pandas as pd
 import json
+import traceback
 
 
 LOGGER = getLogger(__name__)
@@ -44,6 +44,9 @@ class BaseDatabase:
         "files": None
     }
 
+    # default column containing areas names
+    _area_column: str = "nome_area"
+
 
     def _get_path(
         self, x: Resource, /, base_keys: List[str], file_key: str
@@ -100,10 +103,7 @@ class BaseDatabase:
 
         self._logger.debug("Updating database")
 
-        if not self._local["dir"].exists():
-            os.mkdir(self._local["dir"])
-
-            self._logger.info(f"New directory \"{self._local['dir']}\"")
+        self._local["dir"].mkdir(parents=True, exist_ok=True)
 
         if len(args) == 0:
             keys = list(self._remote["files"].keys())
@@ -122,6 +122,19 @@ class BaseDatabase:
 
             self._logger.debug(f"Written file \"{local_path}\"")
 
+            # columnar copy of csv files for faster reads
+            if local_path.suffix == ".csv":
+                parquet_path = local_path.with_suffix(".parquet")
+
+                try:
+                    pd.read_csv(local_path).to_parquet(parquet_path)
+                    self._logger.debug(f"Written file \"{parquet_path}\"")
+                except:
+                    self._logger.warning(
+                        f"Unable to write \"{parquet_path}\"; "
+                        "falling back to csv"
+                    )
+
 
     def __init__(self, /, remote: RemoteResource, local: LocalResource):
         """Parameters:
@@ -134,9 +147,12 @@ class BaseDatabase:
         self._logger = getLogger(str(self))
 
         # check keys
-        for var in ["remote", "local"]:
-            if not eval(f"BaseDatabase._{var}.keys() == {var}.keys()"):
-                raise ValueError(f"invalid {var} parameter")
+        for name, value, default in [
+            ("remote", remote, BaseDatabase._remote),
+            ("local", local, BaseDatabase._local)
+        ]:
+            if default.keys() != value.keys():
+                raise ValueError(f"invalid {name} parameter")
 
         # check if all remote files are present in local
         if not np.isin(
@@ -156,8 +172,8 @@ class BaseDatabase:
             )
 
         # store args
-        for var in ["remote", "local"]:
-            exec(f"self._{var} = {var}")
+        self._remote = remote
+        self._local = local
 
         self._logger.debug(
             f"Database created: self = {self}, remote = {self._remote}, "
@@ -167,9 +183,15 @@ class BaseDatabase:
         self.update()
 
 
+    def get_area_column(self) -> str:
+        """Return column containing areas names."""
+
+        return self._area_column
+
+
     def get_df(
         self, key: str, /, area: Optional[str] = None,
-        area_column: Optional[str] = "nome_area", errors: str = "strict",
+        area_column: Optional[str] = None, errors: str = "strict",
         **kwargs
     ) -> Optional[pd.DataFrame]:
         """Get dataframe.
@@ -177,10 +199,17 @@ class BaseDatabase:
         Parameters:
         - key: csv file key (e.g. \"deliveries\")
         - area: area name, if None return data without filtering areas
-        - area_column: column containing areas names
+        - area_column: column containing areas names; if None,
+                       BaseDatabase._area_column is used
         - errors: if unable to get area, an exception is raised when errors is
                   \"strict\"; implemented values are \"strict\" and \"ignore\"
-        - additional kwargs: passed to pandas.read_csv
+        - additional kwargs: passed to pandas.read_csv; when only \"usecols\",
+                             \"dtype\" (as a dict of columns types) and
+                             \"parse_dates\" (as a list of columns names) are
+                             given and an up to date parquet copy of the file
+                             exists, it is read instead of the csv and columns
+                             types are converted after reading; area_column
+                             is added to \"usecols\" when selecting an area
         """
 
         # errors fallback
@@ -190,9 +219,94 @@ class BaseDatabase:
             )
             errors = "ignore"
 
+        if area_column == None:
+            area_column = self._area_column
+
         self._logger.debug(f"Returning \"{key}\" dataframe")
 
-        df = pd.read_csv(self._get_local_path(key), **kwargs)
+        # area column is needed to select area
+        usecols = kwargs.get("usecols")
+        area_column_added = area != None and usecols != None \
+                            and not callable(usecols) \
+                            and area_column not in usecols
+
+        if area_column_added:
+            kwargs["usecols"] = list(usecols) + [area_column]
+
+        path = self._get_local_path(key)
+        parquet_path = path.with_suffix(".parquet")
+
+        # read_csv arguments the parquet copy can be read with
+        parse_dates = kwargs.get("parse_dates")
+        parquet_kwargs = \
+            set(kwargs.keys()) <= {"usecols", "dtype", "parse_dates"} \
+            and not callable(kwargs.get("usecols")) \
+            and type(kwargs.get("dtype", {})) == dict \
+            and (
+                parse_dates == None or type(parse_dates) in [list, tuple]
+                and all(type(column) == str for column in parse_dates)
+            )
+
+        if parquet_kwargs \
+        and parquet_path.exists() \
+        and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+            self._logger.debug(f"Reading \"{parquet_path}\"")
+
+            df = None
+
+            # area rows are selected by pyarrow while reading; when this is
+            # not possible (e.g. missing area_column) errors are handled
+            # below as for csv files
+            if area != None:
+                try:
+                    df = pd.read_parquet(
+                        parquet_path, columns=kwargs.get("usecols"),
+                        filters=[(area_column, "==", area)]
+                    )
+                except:
+                    self._logger.debug(
+                        f"Unable to select area while reading "
+                        f"\"{parquet_path}\": {traceback.format_exc()}"
+                    )
+
+            if df is None:
+                try:
+                    df = pd.read_parquet(
+                        parquet_path, columns=kwargs.get("usecols")
+                    )
+                except:
+                    if not area_column_added:
+                        raise
+
+                    # area_column may be missing; errors are handled below
+                    self._logger.debug(
+                        f"Unable to read \"{parquet_path}\" with "
+                        f"\"{area_column}\": {traceback.format_exc()}"
+                    )
+                    df = pd.read_parquet(parquet_path, columns=usecols)
+
+            # same columns types as read_csv
+            if kwargs.get("dtype") != None:
+                df = df.astype({
+                    column: dtype for column, dtype in kwargs["dtype"].items()
+                    if column in df.columns
+                })
+
+            for column in parse_dates or []:
+                df[column] = pd.to_datetime(df[column])
+        else:
+            try:
+                df = pd.read_csv(path, **kwargs)
+            except:
+                if not area_column_added:
+                    raise
+
+                # area_column may be missing; errors are handled below
+                self._logger.debug(
+                    f"Unable to read \"{path}\" with \"{area_column}\": "
+                    f"{traceback.format_exc()}"
+                )
+                df = pd.read_csv(path, **dict(kwargs, usecols=usecols))
 
         if area == None:
             return df
@@ -201,7 +315,7 @@ class BaseDatabase:
 
         self._logger.debug(f"Selecting area \"{area}\" in \"{area_column}\"")
 
-        if area_column not in df.columns.tolist():
+        if area_column not in df.columns:
             s = f"dataframe does not contain \"{area_column}\""
 
             if errors == "strict":
@@ -210,7 +324,9 @@ class BaseDatabase:
                 self._logger.warning(s.capitalize())
                 return None
 
-        if area not in df.loc[:, area_column].tolist():
+        mask = df[area_column].values == area
+
+        if not mask.any():
             s = f"no data for region \"{area}\""
 
             if errors == "strict":
@@ -219,7 +335,8 @@ class BaseDatabase:
                 self._logger.warning(s.capitalize())
                 return None
 
-        df = df.loc[df.loc[:, area_column] == area].drop(columns=area_column)
+        # rows are renumbered as when selected by pyarrow
+        df = df.loc[mask].drop(columns=area_column).reset_index(drop=True)
 
         return df
 
@@ -227,6 +344,9 @@ class BaseDatabase:
 class Contagions(BaseDatabase):
     """BaseDatabase derived class for Covid-19 contagions data."""
 
+    _area_column: str = "denominazione_regione"
+
+
     def __init__(
         self, remote: RemoteResource = {
             "base_url": "https://raw.githubusercontent.com",
@@ -251,18 +371,6 @@ class Contagions(BaseDatabase):
         BaseDatabase.__init__(self, remote=remote, local=local)
 
 
-    def get_df(
-        self, key: str, /, area: Optional[str] = None, errors: str = "strict",
-        **kwargs
-    ) -> Optional[pd.DataFrame]:
-        """Parameters documented in BaseDatabase.get_df."""
-
-        return BaseDatabase.get_df(
-            self, key, area=area, area_column="denominazione_regione",
-            errors=errors, **kwargs
-        )
-
-
 class Vaccines(BaseDatabase):
     """BaseDatabase derived class for Covid-19 vaccination data."""
 
@@ -330,11 +438,23 @@ class Vaccines(BaseDatabase):
         newer.
         """
 
-        # get keys of missing or old files
+        # get keys of missing or old files;
+        # remote dataset update is fetched at most once
         keys = []
+        newer = None
+
         for key in self._remote["files"]:
-            if not self._get_local_path(key).exists() or \
-            self.remote_dataset_update() > self.local_dataset_update():
+            if not self._get_local_path(key).exists():
+                keys += [key]
+                continue
+
+            # without local update file dataset age is unknown
+            if newer == None:
+                newer = not self._get_local_path("update").exists() or \
+                        self.remote_dataset_update() > \
+                        self.local_dataset_update()
+
+            if newer:
                 keys += [key]
 
         # update
@@ -369,15 +489,3 @@ class Vaccines(BaseDatabase):
         """Parameters documented in BaseDatabase.__init__"""
 
         BaseDatabase.__init__(self, remote=remote, local=local)
-
-
-    def get_df(
-        self, key: str, /, area: Optional[str] = None, errors: str = "strict",
-        **kwargs
-    ) -> Optional[pd.DataFrame]:
-        """Parameters documented in BaseDatabase.get_df."""
-
-        return BaseDatabase.get_df(
-            self, key, area=area, area_column="nome_area", errors=errors,
-            **kwargs
-        )